@@ -11,7 +11,7 @@ from mcp.server.fastmcp import Context as FastMCPContext
 from mcp.server.fastmcp import FastMCP
 from mcp_agent.app import MCPApp
 
-from mcp_registry_search.search import HybridSearch
+from mcp_registry_search.search import HybridSearch, ServerHit
 
 # Create the FastMCP server
 mcp = FastMCP(
@@ -28,12 +28,19 @@ app = MCPApp(
 
 # Lazy initialization of search engine
 _search_engine = None
+_search_engine_lock = asyncio.Lock()
 
 
 async def get_search_engine(ctx: FastMCPContext | None = None):
     """Get or create search engine instance."""
     global _search_engine
-    if _search_engine is None:
+    if _search_engine is not None:
+        return _search_engine
+
+    async with _search_engine_lock:
+        if _search_engine is not None:
+            return _search_engine
+
         import os
 
         if ctx:
@@ -104,7 +111,7 @@ async def search_mcp_servers(
     full_text_weight: float = 1.0,
     semantic_weight: float = 1.0,
     ctx: FastMCPContext | None = None,
-) -> list[dict]:
+) -> list[ServerHit]:
     """
     Search MCP servers using hybrid search (full-text + semantic).
 
@@ -115,14 +122,14 @@ async def search_mcp_servers(
         semantic_weight: Weight for semantic search (0-10, default: 1.0)
 
     Returns:
-        List of server dictionaries with similarity scores
+        List of server hits with similarity scores
     """
     if ctx:
         await ctx.info(f"Searching MCP registry for: {query}")
 
     try:
         search_engine = await get_search_engine(ctx)
-        results = search_engine.search(
+        results = await search_engine.search(
             query=query,
             limit=limit,
             full_text_weight=full_text_weight,
@@ -139,24 +146,28 @@ async def search_mcp_servers(
 
 @mcp.tool()
 async def list_mcp_servers(
-    limit: int = 100, offset: int = 0, ctx: FastMCPContext | None = None
+    limit: int = 100,
+    offset: int = 0,
+    after: str | None = None,
+    ctx: FastMCPContext | None = None,
 ) -> list[dict]:
     """
     List all MCP servers with pagination.
 
     Args:
         limit: Maximum number of results to return (1-1000, default: 100)
-        offset: Number of results to skip (default: 0)
+        offset: Number of results to skip (default: 0; prefer `after` for deep pages)
+        after: Name of the last server from the previous page; returns the servers after it
 
     Returns:
         List of server dictionaries
     """
     if ctx:
-        await ctx.info(f"Listing MCP servers: limit={limit}, offset={offset}")
+        await ctx.info(f"Listing MCP servers: limit={limit}, offset={offset}, after={after}")
 
     try:
         search_engine = await get_search_engine(ctx)
-        servers = search_engine.list_all_servers(limit=limit, offset=offset)
+        servers = await search_engine.list_all_servers(limit=limit, offset=offset, after=after)
         if ctx:
             await ctx.info(f"Successfully retrieved {len(servers)} servers")
         return servers
@@ -166,6 +177,32 @@ async def list_mcp_servers(
         raise
 
 
+@mcp.tool()
+async def get_mcp_server(
+    name: str,
+    ctx: FastMCPContext | None = None,
+) -> dict | None:
+    """
+    Get all details of a single MCP server, including its packages and remotes.
+
+    Args:
+        name: Server name (e.g., "io.github.owner/server")
+
+    Returns:
+        Server dictionary, or None if no server has that name
+    """
+    if ctx:
+        await ctx.info(f"Fetching MCP server: {name}")
+
+    try:
+        search_engine = await get_search_engine(ctx)
+        return await search_engine.get_server_details(name)
+    except Exception as e:
+        if ctx:
+            await ctx.error(f"Error fetching server: {str(e)}")
+        raise
+
+
 async def main():
     """Main entry point for local testing."""
     async with app.run():
@@ -174,7 +211,7 @@ async def main():
         search_results = await search_mcp_servers(query="kubernetes", limit=3)
         print(f"Found {len(search_results)} results:")
         for result in search_results:
-            print(f"  - {result['name']} (score: {result.get('similarity_score', 0):.4f})")
+            print(f"  - {result.name} (score: {result.similarity_score:.4f})")
 
         # Test list
         print("\n=== Testing List ===")
@@ -185,18 +222,18 @@ async def main():
 
 
 @mcp.resource("mcp-registry://search/{query}")
-def search_resource(query: str) -> str:
+async def search_resource(query: str) -> str:
     """Expose search results as a formatted text resource."""
-    engine = _search_engine or HybridSearch()
-    results = engine.search(query=query, limit=10)
+    engine = await get_search_engine()
+    results = await engine.search(query=query, limit=10)
     output = f"# Search Results for: {query}\n\n"
     for i, result in enumerate(results, 1):
-        output += f"## {i}. {result['name']}\n"
-        output += f"**Version:** {result['version']}\n"
-        output += f"**Description:** {result['description']}\n"
-        if result.get("repository"):
-            output += f"**Repository:** {result['repository'].get('url', 'N/A')}\n"
-        output += f"**Score:** {result.get('similarity_score', 0):.4f}\n\n"
+        output += f"## {i}. {result.name}\n"
+        output += f"**Version:** {result.version}\n"
+        output += f"**Description:** {result.description}\n"
+        if result.repository:
+            output += f"**Repository:** {result.repository.get('url', 'N/A')}\n"
+        output += f"**Score:** {result.similarity_score:.4f}\n\n"
     return output
 
 
@@ -13,19 +13,35 @@ create table if not exists mcp_servers (
     status text,
     is_latest boolean default false,
     search_text text, -- For full-text search
-    embedding vector(1536), -- OpenAI text-embedding-3-small dimensions
+    embedding halfvec(1536), -- OpenAI text-embedding-3-small dimensions, stored as fp16
     created_at timestamp with time zone default now(),
     updated_at timestamp with time zone default now()
 );
 
+-- Store embeddings as halfvec (fp16, pgvector >= 0.7): half the storage and index size,
+-- and faster distance computations with negligible recall loss. Runs before the index is
+-- created below so existing vector(1536) databases get a halfvec_cosine_ops index
+do $$
+begin
+    if exists (
+        select 1 from information_schema.columns
+        where table_name = 'mcp_servers' and column_name = 'embedding' and udt_name = 'vector'
+    ) then
+        drop index if exists mcp_servers_embedding_idx;
+        alter table mcp_servers alter column embedding type halfvec(1536) using embedding::halfvec(1536);
+    end if;
+end $$;
+
 -- Create index for full-text search
 create index if not exists mcp_servers_search_text_idx on mcp_servers using gin(to_tsvector('english', search_text));
 
--- Create index for vector similarity search (HNSW for fast approximate nearest neighbor)
-create index if not exists mcp_servers_embedding_idx on mcp_servers using hnsw (embedding vector_cosine_ops);
+-- Create index for vector similarity search (HNSW for fast approximate nearest neighbor).
+-- Unlike IVFFlat, HNSW needs no retraining/reindexing after the nightly ETL upserts.
+create index if not exists mcp_servers_embedding_idx on mcp_servers
+    using hnsw (embedding halfvec_cosine_ops) with (m = 16, ef_construction = 64);
 
--- Create index on name for lookups
-create index if not exists mcp_servers_name_idx on mcp_servers(name);
+-- Name lookups and keyset pagination (order by name, name > $after) use the btree index
+-- backing the unique constraint on name; no separate index is needed
 
 -- Function to automatically update search_text
 create or replace function update_search_text()
@@ -47,7 +63,9 @@ create trigger update_search_text_trigger
 -- Drop old function to allow changing return type (safe if re-created below)
 drop function if exists hybrid_search(text, vector(1536), integer, double precision, double precision);
 
--- Function for hybrid search (combines full-text and vector similarity)
+-- Function for hybrid search (combines full-text and vector similarity).
+-- Results are fused with Reciprocal Rank Fusion: each list contributes weight / (k + rank),
+-- so scores do not depend on the very different scales of ts_rank and cosine similarity.
 create or replace function hybrid_search(
     query_text text,
     query_embedding vector(1536),
@@ -68,27 +86,45 @@ returns table (
 )
 language plpgsql
 as $$
+declare
+    rrf_k constant integer := 60;
 begin
+    -- HNSW returns at most ef_search candidates, so keep it above the semantic candidate limit
+    perform set_config('hnsw.ef_search', greatest(40, match_limit * 3)::text, true);
+
     return query
+    -- Each CTE ranks an already-limited candidate list: the inner order by + limit lets
+    -- the planner use an ordered HNSW index scan (and a top-N sort for full-text), which
+    -- a limit applied to row_number() output would not
     with semantic_search as (
         select
-            mcp_servers.id,
-            1 - (mcp_servers.embedding <=> query_embedding) as similarity
-        from mcp_servers
-        where mcp_servers.embedding is not null
-          and coalesce(lower(mcp_servers.status), 'unknown') <> 'deleted'
-        order by mcp_servers.embedding <=> query_embedding
-        limit match_limit * 3
+            candidates.id,
+            row_number() over (order by candidates.distance) as rank_ix
+        from (
+            select
+                mcp_servers.id,
+                mcp_servers.embedding <=> query_embedding::halfvec(1536) as distance
+            from mcp_servers
+            where mcp_servers.embedding is not null
+              and coalesce(lower(mcp_servers.status), 'unknown') <> 'deleted'
+            order by distance
+            limit match_limit * 3
+        ) candidates
     ),
     full_text_search as (
         select
-            mcp_servers.id,
-            ts_rank(to_tsvector('english', mcp_servers.search_text), plainto_tsquery('english', query_text)) as rank
-        from mcp_servers
-        where to_tsvector('english', mcp_servers.search_text) @@ plainto_tsquery('english', query_text)
-          and coalesce(lower(mcp_servers.status), 'unknown') <> 'deleted'
-        order by rank desc
-        limit match_limit * 3
+            candidates.id,
+            row_number() over (order by candidates.rank desc) as rank_ix
+        from (
+            select
+                mcp_servers.id,
+                ts_rank(to_tsvector('english', mcp_servers.search_text), plainto_tsquery('english', query_text)) as rank
+            from mcp_servers
+            where to_tsvector('english', mcp_servers.search_text) @@ plainto_tsquery('english', query_text)
+              and coalesce(lower(mcp_servers.status), 'unknown') <> 'deleted'
+            order by rank desc
+            limit match_limit * 3
+        ) candidates
     )
     select
         mcp_servers.id,
@@ -100,8 +136,8 @@ begin
         mcp_servers.remotes,
         mcp_servers.status,
         (
-          (coalesce(semantic_search.similarity, 0.0) * semantic_weight +
-           coalesce(full_text_search.rank, 0.0) * full_text_weight)
+          (coalesce(1.0 / (rrf_k + semantic_search.rank_ix), 0.0) * semantic_weight +
+           coalesce(1.0 / (rrf_k + full_text_search.rank_ix), 0.0) * full_text_weight)
           *
           (
             case lower(coalesce(mcp_servers.status, 'unknown'))
@@ -115,12 +151,11 @@ begin
             end
           )
           * (case when mcp_servers.is_latest then 1.00 else 0.90 end)
-        ) as similarity_score
-    from mcp_servers
-    left join semantic_search on mcp_servers.id = semantic_search.id
-    left join full_text_search on mcp_servers.id = full_text_search.id
-    where (semantic_search.id is not null or full_text_search.id is not null)
-      and coalesce(lower(mcp_servers.status), 'unknown') <> 'deleted'
+        )::double precision as similarity_score
+    from semantic_search
+    full outer join full_text_search on semantic_search.id = full_text_search.id
+    join mcp_servers on mcp_servers.id = coalesce(semantic_search.id, full_text_search.id)
+    where coalesce(lower(mcp_servers.status), 'unknown') <> 'deleted'
     order by similarity_score desc
     limit match_limit;
 end;
@@ -129,3 +164,6 @@ $$;
 -- Idempotent alterations for existing databases
 alter table if exists mcp_servers add column if not exists status text;
 alter table if exists mcp_servers add column if not exists is_latest boolean default false;
+
+-- Redundant with the unique constraint's index; dropping it saves a write per upsert
+drop index if exists mcp_servers_name_idx;
@@ -1,18 +1,82 @@
 """FastAPI application for MCP registry search."""
 
+import asyncio
+import logging
 import os
-from typing import Annotated
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Annotated, Any, Literal
 
-from fastapi import FastAPI, Header, HTTPException, Query
+import orjson
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from mcp_registry_search.search import HybridSearch
+from mcp_registry_search.cache import SingleFlight, TTLCache
+from mcp_registry_search.search import SERVER_COLUMNS, SUMMARY_COLUMNS, HybridSearch, ServerHit
+
+logger = logging.getLogger(__name__)
+
+# Results are refreshed nightly by the ETL, so short-lived caching is safe. The cron
+# runs in its own function and cannot reach these caches; the TTL bounds staleness
+CACHE_TTL_SECONDS = 300
+CACHE_CONTROL = f"public, s-maxage={CACHE_TTL_SECONDS}, stale-while-revalidate=60"
+
+# /servers pages can hold up to 1000 full rows and their cursors are user-controlled,
+# so bound the in-process cache by rows held; larger working sets are left to the edge
+SERVERS_CACHE_MAX_ROWS = 5000
+_servers_cache = TTLCache(
+    maxsize=256,
+    ttl=CACHE_TTL_SECONDS,
+    # Pages are lists of rows; single-server entries weigh one row
+    weigh=lambda value: len(value) if isinstance(value, list) else 1,
+    maxweight=SERVERS_CACHE_MAX_ROWS,
+)
+
+# Concurrent identical searches share one embedding + RPC round-trip
+_search_flights = SingleFlight()
+
+# Rows fetched per Supabase request when streaming /servers as NDJSON
+NDJSON_CHUNK_SIZE = 100
+
+# Column projections selectable with /servers?fields=
+SERVER_FIELDS = {"full": SERVER_COLUMNS, "summary": SUMMARY_COLUMNS}
+
+# Guards lazy creation of the search engine if startup could not create it
+_search_engine_lock = asyncio.Lock()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared search engine, warm it up in the background, and close it on shutdown."""
+    app.state.search_engine = None
+    warmup_task = None
+    try:
+        app.state.search_engine = HybridSearch()
+    except ValueError as e:
+        # Keep the app up (health/debug still work); retried on first use
+        logger.warning("Search engine not initialized at startup: %s", e)
+    else:
+        # Comma-separated queries to pre-cache, e.g. "kubernetes,filesystem"
+        warmup_queries = [
+            q.strip() for q in os.getenv("SEARCH_WARMUP_QUERIES", "").split(",") if q.strip()
+        ]
+        warmup_task = asyncio.create_task(app.state.search_engine.warmup(warmup_queries))
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+    # Also covers an engine created lazily by get_search_engine
+    if app.state.search_engine is not None:
+        await app.state.search_engine.aclose()
+
 
 app = FastAPI(
     title="MCP Registry Search API",
     description="Semantic search API for Model Context Protocol (MCP) servers",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Enable CORS
@@ -24,22 +88,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Lazy initialization of search engine
-_search_engine = None
+
+async def get_search_engine(request: Request) -> HybridSearch:
+    """Return the shared search engine, creating it if startup did not."""
+    state = request.app.state
+    if getattr(state, "search_engine", None) is None:
+        async with _search_engine_lock:
+            if getattr(state, "search_engine", None) is None:
+                try:
+                    state.search_engine = HybridSearch()
+                except ValueError as e:
+                    raise HTTPException(
+                        status_code=500, detail=f"Search engine unavailable: {str(e)}"
+                    )
+    return state.search_engine
 
 
-def get_search_engine():
-    """Get or create search engine instance."""
-    global _search_engine
-    if _search_engine is None:
-        _search_engine = HybridSearch()
-    return _search_engine
+def _json_response(content: dict[str, Any]) -> Response:
+    """Encode a cacheable JSON body with orjson.
+
+    Returning a Response directly skips FastAPI's response_model validation and
+    re-serialization of every row; the models below still document the schema.
+    """
+    return Response(
+        orjson.dumps(content),
+        media_type="application/json",
+        headers={"Cache-Control": CACHE_CONTROL},
+    )
 
 
 class SearchResponse(BaseModel):
     """Search response model."""
 
-    results: list[dict]
+    results: list[ServerHit]
     query: str
     limit: int
     count: int
@@ -52,6 +133,7 @@ class ServersResponse(BaseModel):
     limit: int
     offset: int
     count: int
+    next_cursor: str | None = None
 
 
 @app.get("/")
@@ -63,6 +145,7 @@ def root():
         "endpoints": {
             "/search": "Search MCP servers",
             "/servers": "List all MCP servers",
+            "/servers/{name}": "Get a single MCP server",
             "/health": "Health check",
             "/docs": "API documentation",
         },
@@ -90,7 +173,8 @@ def debug():
 
 
 @app.get("/search", response_model=SearchResponse)
-def search(
+async def search(
+    search_engine: Annotated[HybridSearch, Depends(get_search_engine)],
     q: Annotated[str, Query(description="Search query")],
     limit: Annotated[int, Query(ge=1, le=100, description="Maximum number of results")] = 10,
     full_text_weight: Annotated[
@@ -109,33 +193,145 @@ def search(
     - **semantic_weight**: Weight for semantic search (0-10, default: 1.0)
     """
     try:
-        results = get_search_engine().search(
-            query=q, limit=limit, full_text_weight=full_text_weight, semantic_weight=semantic_weight
+        # Results are cached by HybridSearch; this only coalesces concurrent misses
+        results = await _search_flights.do(
+            (q, limit, full_text_weight, semantic_weight),
+            lambda: search_engine.search(
+                query=q,
+                limit=limit,
+                full_text_weight=full_text_weight,
+                semantic_weight=semantic_weight,
+            ),
+        )
+        return _json_response(
+            {"results": results, "query": q, "limit": limit, "count": len(results)}
         )
-        return SearchResponse(results=results, query=q, limit=limit, count=len(results))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
+async def _iter_servers_ndjson(
+    search_engine: HybridSearch,
+    first_chunk: list[dict[str, Any]],
+    limit: int,
+    columns: tuple[str, ...],
+) -> AsyncIterator[bytes]:
+    """Yield servers as NDJSON lines, fetching them in keyset-paginated chunks.
+
+    The first chunk is fetched by the caller before the response starts, so a
+    failing backend still gets a proper error status.
+    """
+    chunk = first_chunk
+    remaining = limit
+    while True:
+        requested = min(NDJSON_CHUNK_SIZE, remaining)
+        for server in chunk:
+            yield orjson.dumps(server) + b"\n"
+        remaining -= len(chunk)
+        if len(chunk) < requested or remaining <= 0:
+            return
+        chunk = await search_engine.list_all_servers(
+            limit=min(NDJSON_CHUNK_SIZE, remaining), after=chunk[-1]["name"], columns=columns
+        )
+
+
 @app.get("/servers", response_model=ServersResponse)
-def list_servers(
+async def list_servers(
+    search_engine: Annotated[HybridSearch, Depends(get_search_engine)],
     limit: Annotated[int, Query(ge=1, le=1000, description="Maximum number of results")] = 100,
-    offset: Annotated[int, Query(ge=0, description="Number of results to skip")] = 0,
+    offset: Annotated[
+        int, Query(ge=0, deprecated=True, description="Number of results to skip")
+    ] = 0,
+    after: Annotated[
+        str | None, Query(description="Cursor from a previous page's next_cursor")
+    ] = None,
+    output_format: Annotated[
+        Literal["json", "ndjson"],
+        Query(alias="format", description="Response format: json (default) or ndjson"),
+    ] = "json",
+    fields: Annotated[
+        Literal["full", "summary"],
+        Query(description="full (default) or summary (name, description, version)"),
+    ] = "full",
 ):
     """
     List all MCP servers with pagination.
 
     - **limit**: Maximum number of results (1-1000, default: 100)
-    - **offset**: Number of results to skip (default: 0)
+    - **after**: Cursor returned as `next_cursor` by the previous page
+    - **offset**: Number of results to skip (deprecated, use `after`; default: 0)
+    - **format**: `json` (default) or `ndjson` to stream one server per line
+    - **fields**: `full` (default) or `summary` to omit the repository/packages/remotes details
     """
+    columns = SERVER_FIELDS[fields]
+    if output_format == "ndjson":
+        first_size = min(NDJSON_CHUNK_SIZE, limit)
+        try:
+            first_chunk = await search_engine.list_all_servers(
+                limit=first_size, offset=offset, after=after, columns=columns
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"List servers failed: {str(e)}")
+        # Later chunks are fetched after the headers are sent, and a failure there can
+        # only truncate the body; let the edge cache the stream only if it is complete
+        complete = len(first_chunk) < first_size or first_size == limit
+        return StreamingResponse(
+            _iter_servers_ndjson(search_engine, first_chunk, limit, columns),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": CACHE_CONTROL if complete else "no-store"},
+        )
+
+    cache_key = (limit, offset, after, fields)
+    servers = _servers_cache.get(cache_key)
     try:
-        servers = get_search_engine().list_all_servers(limit=limit, offset=offset)
-        return ServersResponse(servers=servers, limit=limit, offset=offset, count=len(servers))
+        if servers is None:
+            servers = await search_engine.list_all_servers(
+                limit=limit, offset=offset, after=after, columns=columns
+            )
+            _servers_cache.set(cache_key, servers)
+        next_cursor = servers[-1]["name"] if len(servers) == limit else None
+        return _json_response(
+            {
+                "servers": servers,
+                "limit": limit,
+                "offset": offset,
+                "count": len(servers),
+                "next_cursor": next_cursor,
+            }
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"List servers failed: {str(e)}")
 
 
-@app.get("/api/cron/etl")
+@app.get("/servers/{name:path}")
+async def get_server(
+    search_engine: Annotated[HybridSearch, Depends(get_search_engine)],
+    name: str,
+):
+    """
+    Get all details of a single MCP server.
+
+    - **name**: Server name, e.g. `io.github.owner/server`
+    """
+    cache_key = ("server", name)
+    server = _servers_cache.get(cache_key)
+    if server is None:
+        try:
+            server = await search_engine.get_server_details(name)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Get server failed: {str(e)}")
+        if server is None:
+            raise HTTPException(status_code=404, detail=f"Server not found: {name}")
+        _servers_cache.set(cache_key, server)
+    return _json_response(server)
+
+
+# Served by this app and, on its own, by the Vercel cron function (api/cron/etl.py),
+# which must not run the search engine lifespan and warmup
+cron_router = APIRouter()
+
+
+@cron_router.get("/api/cron/etl")
 async def etl_cron(authorization: Annotated[str | None, Header()] = None):
     """
     ETL cron job endpoint. Runs nightly via Vercel Cron.
@@ -160,6 +356,9 @@ async def etl_cron(authorization: Annotated[str | None, Header()] = None):
         raise HTTPException(status_code=500, detail=f"ETL failed: {str(e)}")
 
 
+app.include_router(cron_router)
+
+
 def main():
     """Run the API server."""
     import uvicorn
@@ -0,0 +1,182 @@
+"""In-process caching helpers."""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Sequence
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL.
+
+    Besides the entry count, the cache can be bounded by total weight (e.g. rows held
+    across all entries) by passing both ``weigh`` and ``maxweight``.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        weigh: Callable[[Any], int] | None = None,
+        maxweight: int | None = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept (least recently used are evicted)
+            ttl: Seconds after which an entry is considered stale
+            weigh: Returns the weight of a value (default: every value weighs 1)
+            maxweight: Maximum total weight kept; values heavier than this are not cached
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.weigh = weigh or (lambda value: 1)
+        self.maxweight = maxweight
+        self.weight = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value, weight = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.weight -= weight
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting least recently used entries if over a bound."""
+        weight = self.weigh(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.weight -= old[2]
+            if self.maxweight is not None and weight > self.maxweight:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value, weight)
+            self.weight += weight
+            while len(self._data) > self.maxsize or (
+                self.maxweight is not None and self.weight > self.maxweight
+            ):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self.weight -= evicted
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller for a key starts the computation; callers arriving while it is in
+    flight await the same result (or exception) instead of repeating the work.
+    The computation runs in its own task, so cancelling any caller, including the one
+    that started it, never cancels the shared work for the others.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    def _forget(self, key: Hashable, fut: asyncio.Future) -> None:
+        """Drop a finished computation so the next call for key starts afresh."""
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        if not fut.cancelled():
+            # Mark the exception as retrieved in case every caller was cancelled
+            fut.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of fn(), sharing it with concurrent callers for key."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Shield so a cancelled caller does not cancel the shared computation
+        return await asyncio.shield(task)
+
+    async def do_many(
+        self,
+        keys: Sequence[Hashable],
+        fn: Callable[[list[Hashable]], Awaitable[list[T]]],
+    ) -> dict[Hashable, T]:
+        """Batch variant of do(): return a result for each key, sharing in-flight work.
+
+        Keys already in flight are awaited; fn is called once, in its own task, with
+        the remaining keys and must return their results in the same order.
+        """
+        waiting: dict[Hashable, asyncio.Future] = {}
+        own = []
+        for key in dict.fromkeys(keys):
+            fut = self._inflight.get(key)
+            if fut is not None:
+                waiting[key] = fut
+            else:
+                own.append(key)
+
+        if own:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in own}
+            for key, fut in futures.items():
+                self._inflight[key] = fut
+                fut.add_done_callback(lambda done, key=key: self._forget(key, done))
+            batch = asyncio.ensure_future(fn(own))
+            batch.add_done_callback(lambda done: _resolve_batch(done, futures))
+            waiting.update(futures)
+
+        # Shield so a cancelled caller does not cancel the shared computation
+        return {key: await asyncio.shield(fut) for key, fut in waiting.items()}
+
+
+def _resolve_batch(batch: asyncio.Future, futures: dict[Hashable, asyncio.Future]) -> None:
+    """Fan a finished do_many batch out to its per-key futures."""
+    if batch.cancelled():
+        for fut in futures.values():
+            fut.cancel()
+        return
+
+    error = batch.exception()
+    if error is None and len(batch.result()) != len(futures):
+        error = ValueError(f"Expected {len(futures)} results, got {len(batch.result())}")
+    if error is not None:
+        for fut in futures.values():
+            fut.set_exception(error)
+    else:
+        for fut, value in zip(futures.values(), batch.result()):
+            fut.set_result(value)
@@ -0,0 +1,59 @@
+"""Shared Supabase client configuration."""
+
+import os
+from typing import TYPE_CHECKING
+
+import httpx
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+# PostgREST request timeout in seconds; covers hybrid_search RPCs and ETL upsert batches
+POSTGREST_TIMEOUT = 30.0
+# Fail fast when Supabase is unreachable instead of waiting out the full timeout
+POSTGREST_CONNECT_TIMEOUT = 5.0
+
+# Keep enough warm connections for concurrent searches and ETL upsert batches, and keep
+# them longer than httpx's 5s default so bursts separated by short pauses skip the
+# TCP/TLS handshake
+POSTGREST_LIMITS = httpx.Limits(
+    max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0
+)
+
+
+def create_supabase_client(url: str | None = None, key: str | None = None) -> "AsyncClient":
+    """Create an async Supabase client configured for server-side use.
+
+    All consumers (search engine, ETL) go through this factory so they share the
+    same timeouts, connection pool limits and session settings. Requests go over
+    HTTP/2, so concurrent RPCs are multiplexed on a single connection.
+
+    Args:
+        url: Supabase URL (falls back to SUPABASE_URL env var)
+        key: Supabase key (falls back to SUPABASE_KEY env var)
+    """
+    from supabase import AsyncClient, AsyncClientOptions
+
+    url = (url or os.getenv("SUPABASE_URL", "")).strip()
+    key = (key or os.getenv("SUPABASE_KEY", "")).strip()
+    if not url or not key:
+        raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set")
+
+    httpx_client = httpx.AsyncClient(
+        http2=True,
+        limits=POSTGREST_LIMITS,
+        timeout=httpx.Timeout(POSTGREST_TIMEOUT, connect=POSTGREST_CONNECT_TIMEOUT),
+        follow_redirects=True,
+    )
+    options = AsyncClientOptions(
+        # API-key access only: there are no user sessions to persist or refresh
+        auto_refresh_token=False,
+        persist_session=False,
+        httpx_client=httpx_client,
+    )
+    return AsyncClient(url, key, options)
+
+
+async def close_supabase_client(client: "AsyncClient") -> None:
+    """Close the connection pool of a client made by create_supabase_client."""
+    await client.options.httpx_client.aclose()
@@ -2,13 +2,17 @@
 
 import asyncio
 import os
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from urllib.parse import quote
 
 import httpx
-from dotenv import load_dotenv
-from openai import OpenAI
-from supabase import Client, create_client
+import orjson
+
+from mcp_registry_search.db import close_supabase_client, create_supabase_client
+from mcp_registry_search.search import EMBEDDING_MODEL, validate_embeddings
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
 
 REGISTRY_BASE_URL = "https://registry.modelcontextprotocol.io"
 
@@ -28,7 +32,7 @@ async def fetch_all_servers() -> list[dict[str, Any]]:
             response = await client.get(url)
             response.raise_for_status()
 
-            data = response.json()
+            data = orjson.loads(response.content)
             batch = data.get("servers", [])
             servers.extend(batch)
 
@@ -77,38 +81,56 @@ def transform_latest_servers(servers: list[dict[str, Any]]) -> list[dict[str, An
 
 
 async def generate_embeddings(texts: list[str]) -> list[list[float]]:
-    """Generate embeddings using OpenAI API."""
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    """Generate embeddings using OpenAI API.
+
+    Batches are dispatched concurrently (bounded by a semaphore) over a single
+    client, and results are returned in the same order as ``texts``. Vectors are
+    transferred base64-encoded (the SDK default) and decoded in bulk; Postgres converts
+    them to halfvec on upsert.
+    """
+    from openai import AsyncOpenAI
+
+    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
     print(f"Generating embeddings for {len(texts)} servers...")
 
     # OpenAI allows up to 2048 texts per batch for text-embedding-3-small
     # We'll process in batches of 500 to be safe
     batch_size = 500
-    all_embeddings = []
-
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i : i + batch_size]
-        print(f"  Processing batch {i // batch_size + 1}/{(len(texts) - 1) // batch_size + 1}")
+    batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+    sem = asyncio.Semaphore(8)
 
-        response = client.embeddings.create(
-            model="text-embedding-3-small", input=batch, encoding_format="float"
-        )
+    async def _one(batch: list[str], idx: int) -> list[list[float]]:
+        async with sem:
+            print(f"  Processing batch {idx + 1}/{len(batches)}")
+            # Leaving encoding_format unset lets the SDK request base64 and decode it in
+            # bulk (with numpy when available) instead of parsing JSON float arrays
+            response = await client.embeddings.create(model=EMBEDDING_MODEL, input=batch)
+        validate_embeddings(response.data, len(batch))
+        return [item.embedding for item in response.data]
 
-        embeddings = [item.embedding for item in response.data]
-        all_embeddings.extend(embeddings)
+    async with client:
+        results = await asyncio.gather(*[_one(b, i) for i, b in enumerate(batches)])
 
-    return all_embeddings
+    return [embedding for batch_embeddings in results for embedding in batch_embeddings]
 
 
 async def upsert_servers_to_supabase(
-    supabase: Client, servers: list[dict[str, Any]], embedding_map: dict[str, list[float] | None]
+    supabase: "AsyncClient",
+    servers: list[dict[str, Any]],
+    embedding_map: dict[str, list[float] | None],
 ):
     """Upsert servers and embeddings to Supabase.
 
     embedding_map provides an embedding (or None) by server name. Deleted servers will
     be upserted with null embeddings so search can safely exclude them.
+
+    Rows are written with ``return=minimal`` so PostgREST does not echo every upserted
+    row (including its 1536-dim embedding) back in the response. Batches are sent
+    concurrently, bounded by a semaphore to stay clear of Supabase rate limits.
     """
+    from postgrest import ReturnMethod
+
     print(f"Upserting {len(servers)} servers to Supabase...")
 
     rows = []
@@ -129,10 +151,19 @@ async def upsert_servers_to_supabase(
         )
 
     batch_size = 100
-    for i in range(0, len(rows), batch_size):
-        batch = rows[i : i + batch_size]
-        print(f"  Upserting batch {i // batch_size + 1}/{(len(rows) - 1) // batch_size + 1}")
-        supabase.table("mcp_servers").upsert(batch, on_conflict="name").execute()
+    batches = [rows[i : i + batch_size] for i in range(0, len(rows), batch_size)]
+    sem = asyncio.Semaphore(4)
+
+    async def _one(batch: list[dict[str, Any]], idx: int) -> None:
+        async with sem:
+            print(f"  Upserting batch {idx + 1}/{len(batches)}")
+            await (
+                supabase.table("mcp_servers")
+                .upsert(batch, on_conflict="name", returning=ReturnMethod.minimal)
+                .execute()
+            )
+
+    await asyncio.gather(*[_one(b, i) for i, b in enumerate(batches)])
 
     print("Upsert completed!")
 
@@ -143,15 +174,16 @@ async def main(limit: int | None = None):
     Args:
         limit: Optional limit on number of servers to process (for testing)
     """
-    # Initialize Supabase client
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
-
-    if not supabase_url or not supabase_key:
-        raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
+    # Initialize Supabase client (raises ValueError if SUPABASE_URL/SUPABASE_KEY are unset)
+    supabase = create_supabase_client()
+    try:
+        await _run_pipeline(supabase, limit)
+    finally:
+        await close_supabase_client(supabase)
 
-    supabase = create_client(supabase_url, supabase_key)
 
+async def _run_pipeline(supabase: "AsyncClient", limit: int | None) -> None:
+    """Fetch, transform, embed and upsert servers using the given Supabase client."""
     # Fetch all servers
     print("Starting ETL pipeline...")
     all_servers = await fetch_all_servers()
@@ -174,15 +206,13 @@ async def main(limit: int | None = None):
     # Generate embeddings
     embeddings = await generate_embeddings(search_texts) if search_texts else []
 
-    # Build name->embedding map
-    embedding_map: dict[str, list[float] | None] = {}
-    for s, emb in zip(non_deleted, embeddings):
-        embedding_map[s["name"]] = emb
-    # Deleted servers (and any without embedding) get None
-    for s in latest_servers:
-        embedding_map.setdefault(s["name"], None)
+    # Build name->embedding map; deleted servers (and any without embedding) get None
+    embedding_map: dict[str, list[float] | None] = dict.fromkeys(
+        (s["name"] for s in latest_servers), None
+    )
+    embedding_map.update(zip((s["name"] for s in non_deleted), embeddings))
 
-    # Upsert to Supabase
+    # Upsert to Supabase (the HNSW embedding index stays valid; no reindex needed)
     await upsert_servers_to_supabase(supabase, latest_servers, embedding_map)
 
     print("✅ ETL pipeline completed successfully!")
@@ -190,6 +220,8 @@ async def main(limit: int | None = None):
 
 def cli_main():
     """CLI entry point."""
+    from dotenv import load_dotenv
+
     load_dotenv()
     asyncio.run(main())
 
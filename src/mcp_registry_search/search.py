@@ -1,14 +1,150 @@
 """Search functionality using Supabase hybrid search."""
 
+import asyncio
 import logging
 import os
-from typing import Any
+import re
+import weakref
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
-from openai import OpenAI
-from supabase import Client, create_client
+import orjson
+
+from mcp_registry_search.cache import SingleFlight, TTLCache
+from mcp_registry_search.db import close_supabase_client, create_supabase_client
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+    from supabase import AsyncClient
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+
+# Postgres function (see schema.sql) that fuses full-text and vector search
+RPC_NAME = "hybrid_search"
+
+# Runs of whitespace, and trailing punctuation that does not change a query's meaning
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = ".,;:!?"
+
+# Maximum number of hybrid_search RPCs search_many runs at once
+SEARCH_CONCURRENCY = 8
+
+# Unit vector used by warmup() to exercise hybrid_search without an OpenAI call
+_WARMUP_EMBEDDING = "[" + ",".join(["1"] + ["0"] * (EMBEDDING_DIM - 1)) + "]"
+
+# Search results only change when the ETL refreshes mcp_servers (nightly), so they can
+# be reused for a few minutes; the TTL is the only bound on staleness after a refresh
+RESULT_CACHE_TTL_SECONDS = 300
+
+# Columns returned for a server; packages and remotes are large JSONB blobs
+SERVER_COLUMNS = (
+    "name",
+    "description",
+    "version",
+    "repository",
+    "packages",
+    "remotes",
+    "status",
+    "is_latest",
+)
+# Lightweight projection for listings that only show a summary of each server
+SUMMARY_COLUMNS = ("name", "description", "version")
+
+
+@dataclass(slots=True, frozen=True)
+class ServerHit:
+    """A single hybrid_search result row (see the function's return table in schema.sql).
+
+    Slots keep each hit far smaller than the row dict it is built from. Hits are
+    cached and shared between callers, so treat them as read-only, including the
+    repository, packages and remotes JSON they hold. orjson and pydantic serialize
+    it like the original row.
+    """
+
+    id: int
+    name: str
+    description: str | None
+    version: str | None
+    repository: dict[str, Any] | None
+    packages: list[dict[str, Any]] | None
+    remotes: list[dict[str, Any]] | None
+    status: str | None
+    similarity_score: float
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> "ServerHit":
+        """Build a hit from a hybrid_search row, ignoring any columns added later."""
+        return cls(
+            id=row["id"],
+            name=row["name"],
+            description=row.get("description"),
+            version=row.get("version"),
+            repository=row.get("repository"),
+            packages=row.get("packages"),
+            remotes=row.get("remotes"),
+            status=row.get("status"),
+            similarity_score=row["similarity_score"],
+        )
+
+
+def _normalize_query(query: str) -> str:
+    """Normalize a query for embedding so trivially different variants share a cache entry.
+
+    Lowercases, collapses whitespace and drops trailing punctuation, so
+    "sqlite MCP server." and " sqlite  mcp server " map to "sqlite mcp server".
+    """
+    collapsed = _WHITESPACE_RE.sub(" ", query.lower()).strip()
+    # Keep all-punctuation queries intact rather than embedding an empty string
+    return collapsed.rstrip(_TRAILING_PUNCTUATION).rstrip() or collapsed
+
+
+def validate_embeddings(data: Sequence[Any], count: int) -> None:
+    """Raise ValueError unless an embeddings response holds count EMBEDDING_DIM vectors.
+
+    Fails fast on a malformed OpenAI response instead of spending a Supabase
+    round-trip for Postgres to reject the dimension mismatch.
+    """
+    if len(data) != count:
+        raise ValueError(f"Expected {count} embeddings, got {len(data)}")
+    for item in data:
+        if len(item.embedding) != EMBEDDING_DIM:
+            raise ValueError(
+                f"Embedding dimension {len(item.embedding)} does not match expected {EMBEDDING_DIM}"
+            )
+
+
+# Clients per event loop and credentials. httpx connection pools are bound to the loop
+# that first used them, so each loop gets its own; entries go away with their loop.
+_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[str, str, str], tuple["AsyncClient", "AsyncOpenAI"]]
+] = weakref.WeakKeyDictionary()
+
+
+def _get_clients(
+    supabase_url: str, supabase_key: str, openai_api_key: str
+) -> tuple["AsyncClient", "AsyncOpenAI"]:
+    """Return the running loop's Supabase and OpenAI clients for the given credentials.
+
+    Reusing the clients keeps their connection pools (and warm TCP/TLS connections)
+    alive across HybridSearch instances instead of re-handshaking for each one.
+    The SDKs are imported here rather than at module load, so importing this module
+    (e.g. for the API's health and debug routes) does not pay their import cost.
+    """
+    loop_clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    credentials = (supabase_url, supabase_key, openai_api_key)
+    if credentials not in loop_clients:
+        from openai import AsyncOpenAI
+
+        loop_clients[credentials] = (
+            create_supabase_client(supabase_url, supabase_key),
+            AsyncOpenAI(api_key=openai_api_key),
+        )
+    return loop_clients[credentials]
+
 
 class HybridSearch:
     """Hybrid search engine using Supabase full-text + vector search."""
@@ -19,7 +155,10 @@ class HybridSearch:
         supabase_key: str | None = None,
         openai_api_key: str | None = None,
     ):
-        """Initialize the search engine with Supabase client.
+        """Initialize the search engine.
+
+        The async Supabase and OpenAI clients are created on first use in each event
+        loop and shared with other instances using the same credentials there.
 
         Args:
             supabase_url: Supabase URL (falls back to SUPABASE_URL env var)
@@ -30,15 +169,18 @@ class HybridSearch:
         supabase_key = (supabase_key or os.getenv("SUPABASE_KEY", "")).strip()
         openai_api_key = (openai_api_key or os.getenv("OPENAI_API_KEY", "")).strip()
 
-        logger.info(
-            f"Initializing HybridSearch with supabase_url={supabase_url[:30] if supabase_url else 'None'}..."
+        # %-style arguments are only formatted if the record is actually emitted
+        logger.debug(
+            "Initializing HybridSearch with supabase_url=%s..., "
+            "SUPABASE_KEY present: %s, OPENAI_API_KEY present: %s",
+            supabase_url[:30] or "None",
+            bool(supabase_key),
+            bool(openai_api_key),
         )
-        logger.info(f"SUPABASE_KEY present: {bool(supabase_key)}")
-        logger.info(f"OPENAI_API_KEY present: {bool(openai_api_key)}")
 
         if not supabase_url or not supabase_key:
             logger.error(
-                f"Missing credentials - URL: {bool(supabase_url)}, KEY: {bool(supabase_key)}"
+                "Missing credentials - URL: %s, KEY: %s", bool(supabase_url), bool(supabase_key)
             )
             raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set")
 
@@ -46,17 +188,121 @@ class HybridSearch:
             logger.error("Missing OPENAI_API_KEY")
             raise ValueError("OPENAI_API_KEY must be set")
 
-        self.supabase: Client = create_client(supabase_url, supabase_key)
-        self.openai_client = OpenAI(api_key=openai_api_key)
-        logger.info("HybridSearch initialized successfully")
+        self._credentials = (supabase_url, supabase_key, openai_api_key)
+        # Embeddings are deterministic per model, so repeat queries can skip OpenAI
+        self._embedding_cache = TTLCache(maxsize=1024, ttl=60 * 60)
+        # Concurrent cache misses for the same query share one OpenAI request
+        self._embedding_flights = SingleFlight()
+        # Final hybrid_search results, so repeat searches skip both OpenAI and Postgres
+        self._result_cache = TTLCache(maxsize=512, ttl=RESULT_CACHE_TTL_SECONDS)
+        logger.debug("HybridSearch initialized successfully")
+
+    @property
+    def supabase(self) -> "AsyncClient":
+        """Supabase client for the running event loop."""
+        return _get_clients(*self._credentials)[0]
+
+    @property
+    def openai_client(self) -> "AsyncOpenAI":
+        """OpenAI client for the running event loop."""
+        return _get_clients(*self._credentials)[1]
+
+    async def aclose(self) -> None:
+        """Close the running loop's clients for this engine's credentials.
+
+        Call on shutdown (e.g. from the API lifespan). Other HybridSearch instances
+        with the same credentials on this loop share the clients and are closed too;
+        they reconnect with new clients on next use.
+        """
+        loop_clients = _clients.get(asyncio.get_running_loop(), {})
+        clients = loop_clients.pop(self._credentials, None)
+        if clients is not None:
+            supabase, openai_client = clients
+            await asyncio.gather(close_supabase_client(supabase), openai_client.close())
+
+    async def _embed_queries(self, queries: list[str]) -> list[str]:
+        """Return embeddings for queries, in order, using the in-process cache when possible.
+
+        Cache keys include the model and dimension so a model change never serves
+        stale vectors, and queries go through _normalize_query so trivial variants hit.
+        Misses already being embedded by a concurrent call are awaited rather than
+        requested again; the rest are embedded with a single OpenAI request.
+
+        Embeddings are returned (and cached) as pgvector text literals such as
+        ``"[0.1,0.2,...]"``, serialized once with orjson. The RPC payload then carries a
+        single string instead of 1536 floats for the JSON encoder to format per call.
+        """
+        keys = [(EMBEDDING_MODEL, EMBEDDING_DIM, _normalize_query(q)) for q in queries]
+        embeddings = {key: self._embedding_cache.get(key) for key in dict.fromkeys(keys)}
+
+        missing = [key for key, embedding in embeddings.items() if embedding is None]
+        if missing:
+            embeddings.update(
+                await self._embedding_flights.do_many(missing, self._fetch_embeddings)
+            )
+
+        return [embeddings[key] for key in keys]
+
+    async def _fetch_embeddings(self, keys: list[tuple[str, int, str]]) -> list[str]:
+        """Embed the queries in keys with one OpenAI request and cache the results.
 
-    def search(
+        Vectors are transferred base64-encoded (the SDK default) and serialized with
+        orjson as is; Postgres casts the literal to halfvec.
+        """
+        # Leaving encoding_format unset lets the SDK request base64 (about half the
+        # bytes) and decode it in bulk instead of parsing a JSON float array
+        response = await self.openai_client.embeddings.create(
+            model=EMBEDDING_MODEL, input=[key[2] for key in keys]
+        )
+        validate_embeddings(response.data, len(keys))
+        embeddings = []
+        # The API returns one item per input, in input order
+        for key, item in zip(keys, response.data):
+            embedding = orjson.dumps(item.embedding).decode()
+            self._embedding_cache.set(key, embedding)
+            embeddings.append(embedding)
+        return embeddings
+
+    async def _hybrid_search_rpc(
+        self,
+        query: str,
+        query_embedding: str,
+        limit: int,
+        full_text_weight: float,
+        semantic_weight: float,
+    ) -> list[ServerHit]:
+        """Call the hybrid_search function in Supabase.
+
+        ``query_embedding`` is a pgvector literal; Postgres casts it to halfvec.
+        """
+        result = await self.supabase.rpc(
+            RPC_NAME,
+            {
+                "query_text": query,
+                "query_embedding": query_embedding,
+                "match_limit": limit,
+                "full_text_weight": full_text_weight,
+                "semantic_weight": semantic_weight,
+            },
+        ).execute()
+
+        return [ServerHit.from_row(row) for row in result.data]
+
+    def embedding_cache_stats(self) -> dict[str, Any]:
+        """Return hit/miss statistics for the query embedding cache."""
+        return self._embedding_cache.stats()
+
+    def result_cache_stats(self) -> dict[str, Any]:
+        """Return hit/miss statistics for the search result cache."""
+        return self._result_cache.stats()
+
+    async def search(
         self,
         query: str,
         limit: int = 10,
         full_text_weight: float = 1.0,
         semantic_weight: float = 1.0,
-    ) -> list[dict[str, Any]]:
+    ) -> list[ServerHit]:
         """
         Perform hybrid search combining full-text and semantic search.
 
@@ -67,45 +313,152 @@ class HybridSearch:
             semantic_weight: Weight for semantic search (default: 1.0)
 
         Returns:
-            List of server dictionaries with similarity scores
+            List of server hits with similarity scores
         """
-        # Generate query embedding
-        response = self.openai_client.embeddings.create(
-            model="text-embedding-3-small", input=query, encoding_format="float"
-        )
-        query_embedding = response.data[0].embedding
+        cache_key = (_normalize_query(query), limit, full_text_weight, semantic_weight)
+        results = self._result_cache.get(cache_key)
+        if results is None:
+            # Generate query embedding
+            [query_embedding] = await self._embed_queries([query])
+            results = await self._hybrid_search_rpc(
+                query, query_embedding, limit, full_text_weight, semantic_weight
+            )
+            self._result_cache.set(cache_key, results)
 
-        # Call the hybrid_search function in Supabase
-        result = self.supabase.rpc(
-            "hybrid_search",
-            {
-                "query_text": query,
-                "query_embedding": query_embedding,
-                "match_limit": limit,
-                "full_text_weight": full_text_weight,
-                "semantic_weight": semantic_weight,
-            },
-        ).execute()
+        # Hits are read-only; copy the list so callers can reorder it without touching the cache
+        return list(results)
 
-        return result.data
+    async def search_many(
+        self,
+        queries: list[str],
+        limit: int = 10,
+        full_text_weight: float = 1.0,
+        semantic_weight: float = 1.0,
+    ) -> list[list[ServerHit]]:
+        """
+        Run several hybrid searches, embedding all queries in one OpenAI request.
+
+        Args:
+            queries: Search query strings
+            limit: Maximum number of results to return per query
+            full_text_weight: Weight for full-text search (default: 1.0)
+            semantic_weight: Weight for semantic search (default: 1.0)
+
+        Returns:
+            One result list per query, in the same order as ``queries``
+        """
+        if not queries:
+            return []
+
+        cache_keys = [
+            (_normalize_query(q), limit, full_text_weight, semantic_weight) for q in queries
+        ]
+        results = [self._result_cache.get(key) for key in cache_keys]
+        # Queries that normalize to the same key share one embedding and one RPC; map each
+        # missing key to the first position that asked for it
+        pending: dict[tuple[str, int, float, float], int] = {}
+        for i, found in enumerate(results):
+            if found is None:
+                pending.setdefault(cache_keys[i], i)
+
+        if pending:
+            query_embeddings = await self._embed_queries([queries[i] for i in pending.values()])
+            sem = asyncio.Semaphore(SEARCH_CONCURRENCY)
+            fetched: dict[tuple[str, int, float, float], list[ServerHit]] = {}
+
+            async def _one(key: tuple[str, int, float, float], i: int, embedding: str) -> None:
+                async with sem:
+                    fetched[key] = await self._hybrid_search_rpc(
+                        queries[i], embedding, limit, full_text_weight, semantic_weight
+                    )
+                self._result_cache.set(key, fetched[key])
+
+            await asyncio.gather(
+                *[_one(key, i, e) for (key, i), e in zip(pending.items(), query_embeddings)]
+            )
+            results = [
+                fetched[key] if found is None else found for key, found in zip(cache_keys, results)
+            ]
+
+        return [list(found) for found in results]
 
-    def list_all_servers(self, limit: int = 100, offset: int = 0) -> list[dict[str, Any]]:
+    async def warmup(self, queries: Sequence[str] = ()) -> None:
+        """
+        Open connections and prime caches so the first real search is not a cold one.
+
+        Without queries, runs a minimal hybrid_search RPC (warming the PostgREST
+        connection and the function's cached plan) and a cheap OpenAI request (warming
+        its TLS connection). With queries, searches them with the default parameters
+        instead, which also fills the embedding and result caches for them.
+        Failures are logged and ignored: warmup is best-effort.
+
+        Args:
+            queries: Queries expected to be popular, e.g. "kubernetes", "filesystem"
+        """
+        try:
+            if queries:
+                await self.search_many(list(queries))
+            else:
+                await asyncio.gather(
+                    self._hybrid_search_rpc("mcp", _WARMUP_EMBEDDING, 1, 0.0, 0.0),
+                    self.openai_client.models.retrieve(EMBEDDING_MODEL),
+                )
+        except Exception as e:
+            logger.warning("HybridSearch warmup failed: %s", e)
+
+    async def list_all_servers(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        after: str | None = None,
+        columns: Sequence[str] = SERVER_COLUMNS,
+    ) -> list[dict[str, Any]]:
         """
         List all servers with pagination.
 
+        Prefer keyset pagination via ``after``: it seeks directly on the ``name`` index
+        instead of scanning and discarding ``offset`` rows.
+
         Args:
             limit: Maximum number of results to return
-            offset: Number of results to skip
+            offset: Number of results to skip (deprecated, ignored when ``after`` is set)
+            after: Return servers whose name sorts after this one (last name of previous page)
+            columns: Columns to select; pass SUMMARY_COLUMNS to skip the heavy JSONB
+                fields and fetch them per server with get_server_details
 
         Returns:
             List of server dictionaries
         """
-        result = (
+        # name is always selected since it is the pagination cursor
+        if "name" not in columns:
+            columns = ("name", *columns)
+
+        query = self.supabase.table("mcp_servers").select(",".join(columns)).order("name")
+        if after is not None:
+            query = query.gt("name", after).limit(limit)
+        else:
+            query = query.range(offset, offset + limit - 1)
+
+        result = await query.execute()
+
+        return result.data
+
+    async def get_server_details(self, name: str) -> dict[str, Any] | None:
+        """
+        Fetch all columns of a single server.
+
+        Args:
+            name: Server name
+
+        Returns:
+            Server dictionary, or None if no server has that name
+        """
+        result = await (
             self.supabase.table("mcp_servers")
-            .select("name,description,version,repository,packages,remotes,status,is_latest")
-            .order("name")
-            .range(offset, offset + limit - 1)
+            .select(",".join(SERVER_COLUMNS))
+            .eq("name", name)
+            .limit(1)
             .execute()
         )
 
-        return result.data
+        return result.data[0] if result.data else None
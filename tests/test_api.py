@@ -0,0 +1,90 @@
+"""Tests for the /servers NDJSON stream, using a stub search engine."""
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from mcp_registry_search.api import CACHE_CONTROL, app, get_search_engine
+
+
+class StubEngine:
+    """Serves list_all_servers from an in-memory, name-ordered table and records calls."""
+
+    def __init__(self, count: int, fail: bool = False):
+        self.rows = [{"name": f"server-{i:04d}"} for i in range(count)]
+        self.fail = fail
+        self.calls = []
+
+    async def list_all_servers(self, limit=100, offset=0, after=None, columns=()):
+        self.calls.append({"limit": limit, "offset": offset, "after": after})
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        rows = self.rows if after is None else [r for r in self.rows if r["name"] > after]
+        start = 0 if after is not None else offset
+        return rows[start : start + limit]
+
+
+@pytest.fixture
+def serve():
+    """Return a factory that points the app at a stub engine and gives back a client."""
+
+    def _serve(engine: StubEngine) -> TestClient:
+        async def override() -> StubEngine:
+            return engine
+
+        app.dependency_overrides[get_search_engine] = override
+        # No context manager, so the lifespan (real engine and warmup) never runs
+        return TestClient(app)
+
+    yield _serve
+    app.dependency_overrides.clear()
+
+
+def ndjson_names(response) -> list[str]:
+    return [orjson.loads(line)["name"] for line in response.content.splitlines()]
+
+
+def test_ndjson_fetches_chunks_with_keyset_cursor(serve):
+    engine = StubEngine(1000)
+
+    response = serve(engine).get("/servers", params={"format": "ndjson", "limit": 250})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert ndjson_names(response) == [f"server-{i:04d}" for i in range(250)]
+    assert engine.calls == [
+        {"limit": 100, "offset": 0, "after": None},
+        {"limit": 100, "offset": 0, "after": "server-0099"},
+        {"limit": 50, "offset": 0, "after": "server-0199"},
+    ]
+    # Later chunks could still fail mid-stream, so the edge must not cache it
+    assert response.headers["cache-control"] == "no-store"
+
+
+def test_ndjson_stops_after_short_final_chunk(serve):
+    engine = StubEngine(130)
+
+    response = serve(engine).get("/servers", params={"format": "ndjson", "limit": 250})
+
+    assert len(ndjson_names(response)) == 130
+    assert [call["after"] for call in engine.calls] == [None, "server-0099"]
+
+
+def test_ndjson_single_chunk_is_cacheable(serve):
+    engine = StubEngine(40)
+
+    response = serve(engine).get("/servers", params={"format": "ndjson", "limit": 250})
+
+    assert len(ndjson_names(response)) == 40
+    assert len(engine.calls) == 1
+    assert response.headers["cache-control"] == CACHE_CONTROL
+
+
+def test_ndjson_first_chunk_failure_returns_500(serve):
+    engine = StubEngine(1000, fail=True)
+
+    response = serve(engine).get("/servers", params={"format": "ndjson", "limit": 250})
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "List servers failed: database unavailable"}
+    assert "no-store" not in response.headers.get("cache-control", "")
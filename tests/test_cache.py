@@ -0,0 +1,243 @@
+"""Tests for the in-process caching helpers."""
+
+import asyncio
+
+import pytest
+
+from mcp_registry_search import cache
+from mcp_registry_search.cache import SingleFlight, TTLCache
+
+
+class Clock:
+    """Controllable stand-in for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_ttl_cache_expires_entries(clock):
+    c = TTLCache(maxsize=10, ttl=5)
+    c.set("a", 1)
+
+    clock.now += 4.9
+    assert c.get("a") == 1
+
+    clock.now += 0.1
+    assert c.get("a") is None
+    assert len(c) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used(clock):
+    c = TTLCache(maxsize=2, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2)
+    # Touch "a" so "b" becomes the least recently used entry
+    assert c.get("a") == 1
+
+    c.set("c", 3)
+
+    assert c.get("b") is None
+    assert c.get("a") == 1
+    assert c.get("c") == 3
+
+
+def test_ttl_cache_stats_and_clear(clock):
+    c = TTLCache(maxsize=4, ttl=60)
+    c.set("a", 1)
+    c.get("a")
+    c.get("missing")
+
+    assert c.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "size": 1, "maxsize": 4}
+
+    c.clear()
+    assert len(c) == 0
+
+
+def test_ttl_cache_bounds_total_weight(clock):
+    c = TTLCache(maxsize=100, ttl=60, weigh=len, maxweight=10)
+    c.set("a", [0] * 4)
+    c.set("b", [0] * 4)
+
+    # Exceeds the bound, so the least recently used entry goes
+    c.set("c", [0] * 4)
+    assert c.get("a") is None
+    assert c.weight == 8
+
+    # Replacing an entry releases its old weight
+    c.set("b", [0])
+    assert c.weight == 5
+
+    # A value heavier than the bound is never cached
+    c.set("d", [0] * 11)
+    assert c.get("d") is None
+    assert c.weight == 5
+
+    clock.now += 60
+    assert c.get("b") is None
+    assert c.weight == 4
+
+
+def counting(result, delay: float = 0.01):
+    """Return an async callable that records its calls and returns result after delay."""
+    calls = []
+
+    async def fn(*args):
+        calls.append(args)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result(*args) if callable(result) else result
+
+    return fn, calls
+
+
+@pytest.mark.asyncio
+async def test_do_coalesces_concurrent_calls():
+    flights = SingleFlight()
+    fn, calls = counting("value")
+
+    results = await asyncio.gather(*(flights.do("k", fn) for _ in range(5)))
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_do_runs_again_once_finished():
+    flights = SingleFlight()
+    fn, calls = counting("value")
+
+    await flights.do("k", fn)
+    await flights.do("k", fn)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_do_fans_out_errors():
+    flights = SingleFlight()
+    fn, calls = counting(RuntimeError("boom"))
+
+    results = await asyncio.gather(*(flights.do("k", fn) for _ in range(3)), return_exceptions=True)
+
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) and str(r) == "boom" for r in results)
+
+
+@pytest.mark.asyncio
+async def test_do_owner_cancellation_does_not_cancel_waiters():
+    flights = SingleFlight()
+    fn, calls = counting("value")
+
+    owner = asyncio.ensure_future(flights.do("k", fn))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(flights.do("k", fn))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+
+    assert await waiter == "value"
+    assert owner.cancelled()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_do_waiter_cancellation_does_not_cancel_owner():
+    flights = SingleFlight()
+    fn, calls = counting("value")
+
+    owner = asyncio.ensure_future(flights.do("k", fn))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(flights.do("k", fn))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+
+    assert await owner == "value"
+    assert waiter.cancelled()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_do_many_joins_keys_already_in_flight():
+    flights = SingleFlight()
+    single, single_calls = counting("from-do")
+    batch, batch_calls = counting(lambda keys: [f"batch-{k}" for k in keys])
+
+    in_flight = asyncio.ensure_future(flights.do("a", single))
+    await asyncio.sleep(0)
+
+    results = await flights.do_many(["a", "b", "c", "b"], batch)
+
+    assert results == {"a": "from-do", "b": "batch-b", "c": "batch-c"}
+    # Only the keys nobody else was computing are passed to fn
+    assert batch_calls == [(["b", "c"],)]
+    assert await in_flight == "from-do"
+    assert len(single_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_do_many_shares_its_batch_with_later_callers():
+    flights = SingleFlight()
+    batch, batch_calls = counting(lambda keys: [k.upper() for k in keys])
+    single, single_calls = counting("unused")
+
+    owner = asyncio.ensure_future(flights.do_many(["a", "b"], batch))
+    await asyncio.sleep(0)
+
+    assert await flights.do("b", single) == "B"
+    assert await owner == {"a": "A", "b": "B"}
+    assert len(batch_calls) == 1
+    assert single_calls == []
+
+
+@pytest.mark.asyncio
+async def test_do_many_fans_out_errors():
+    flights = SingleFlight()
+    batch, _ = counting(RuntimeError("boom"))
+    single, _ = counting("unused")
+
+    owner = asyncio.ensure_future(flights.do_many(["a", "b"], batch))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(flights.do("b", single))
+
+    for task in (owner, waiter):
+        with pytest.raises(RuntimeError, match="boom"):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_do_many_owner_cancellation_does_not_cancel_waiters():
+    flights = SingleFlight()
+    batch, batch_calls = counting(lambda keys: [k.upper() for k in keys])
+    single, _ = counting("unused")
+
+    owner = asyncio.ensure_future(flights.do_many(["a", "b"], batch))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(flights.do("b", single))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+
+    assert await waiter == "B"
+    assert owner.cancelled()
+    assert len(batch_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_do_many_rejects_wrong_result_count():
+    flights = SingleFlight()
+    batch, _ = counting(["only-one"])
+
+    with pytest.raises(ValueError, match="Expected 2 results, got 1"):
+        await flights.do_many(["a", "b"], batch)
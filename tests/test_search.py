@@ -0,0 +1,137 @@
+"""Tests for HybridSearch query handling and caching, using fake Supabase/OpenAI clients."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_registry_search import search
+from mcp_registry_search.search import (
+    EMBEDDING_DIM,
+    HybridSearch,
+    _normalize_query,
+    validate_embeddings,
+)
+
+
+def embedding_item(dim: int = EMBEDDING_DIM) -> SimpleNamespace:
+    return SimpleNamespace(embedding=[0.0] * dim)
+
+
+class FakeOpenAI:
+    """Records embeddings.create inputs and returns one zero vector per input."""
+
+    def __init__(self):
+        self.inputs = []
+        self.embeddings = self
+
+    async def create(self, model: str, input: list[str]) -> SimpleNamespace:
+        self.inputs.append(input)
+        return SimpleNamespace(data=[embedding_item() for _ in input])
+
+
+class FakeSupabase:
+    """Records hybrid_search RPC params and returns one row named after the query."""
+
+    def __init__(self):
+        self.calls = []
+
+    def rpc(self, name: str, params: dict) -> SimpleNamespace:
+        self.calls.append(params)
+        row = {
+            "id": len(self.calls),
+            "name": params["query_text"].strip().lower(),
+            "similarity_score": 0.5,
+        }
+
+        async def execute() -> SimpleNamespace:
+            return SimpleNamespace(data=[row])
+
+        return SimpleNamespace(execute=execute)
+
+
+def make_engine() -> tuple[HybridSearch, FakeSupabase, FakeOpenAI]:
+    """Build an engine whose clients on the running loop are fakes."""
+    engine = HybridSearch(
+        supabase_url="https://example.supabase.co", supabase_key="key", openai_api_key="sk-test"
+    )
+    supabase, openai_client = FakeSupabase(), FakeOpenAI()
+    loop_clients = search._clients.setdefault(asyncio.get_running_loop(), {})
+    loop_clients[engine._credentials] = (supabase, openai_client)
+    return engine, supabase, openai_client
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("sqlite MCP server.", "sqlite mcp server"),
+        ("  sqlite \t mcp\nserver  ", "sqlite mcp server"),
+        ("Docker?!", "docker"),
+        ("...", "..."),
+    ],
+)
+def test_normalize_query(query, expected):
+    assert _normalize_query(query) == expected
+
+
+def test_validate_embeddings_accepts_matching_response():
+    validate_embeddings([embedding_item(), embedding_item()], 2)
+
+
+def test_validate_embeddings_rejects_wrong_count():
+    with pytest.raises(ValueError, match="Expected 2 embeddings, got 1"):
+        validate_embeddings([embedding_item()], 2)
+
+
+def test_validate_embeddings_rejects_wrong_dimension():
+    with pytest.raises(ValueError, match="Embedding dimension 3"):
+        validate_embeddings([embedding_item(3)], 1)
+
+
+@pytest.mark.asyncio
+async def test_search_many_dedupes_queries_by_cache_key():
+    engine, supabase, openai_client = make_engine()
+
+    results = await engine.search_many(["Docker ", "docker", "k8s"])
+
+    assert openai_client.inputs == [["docker", "k8s"]]
+    assert len(supabase.calls) == 2
+    assert [[hit.name for hit in hits] for hits in results] == [["docker"], ["docker"], ["k8s"]]
+    # Positions sharing a key still get their own list
+    assert results[0] is not results[1]
+
+
+@pytest.mark.asyncio
+async def test_search_many_keeps_input_order_across_hits_and_misses():
+    engine, supabase, _ = make_engine()
+    await engine.search("k8s")
+
+    results = await engine.search_many(["postgres", "K8S", "docker"])
+
+    assert [[hit.name for hit in hits] for hits in results] == [["postgres"], ["k8s"], ["docker"]]
+    assert [call["query_text"] for call in supabase.calls] == ["k8s", "postgres", "docker"]
+
+
+@pytest.mark.asyncio
+async def test_result_cache_hits_skip_openai_and_rpc():
+    engine, supabase, openai_client = make_engine()
+    await engine.search("docker")
+
+    assert [hit.name for hit in await engine.search("Docker.")] == ["docker"]
+    await engine.search_many(["docker", " DOCKER "])
+
+    assert len(openai_client.inputs) == 1
+    assert len(supabase.calls) == 1
+    assert engine.result_cache_stats()["hits"] == 3
+
+
+@pytest.mark.asyncio
+async def test_result_cache_miss_reuses_cached_embedding():
+    engine, supabase, openai_client = make_engine()
+    await engine.search("docker")
+
+    # A different limit is a new result key but the same embedding key
+    await engine.search("docker", limit=5)
+
+    assert len(openai_client.inputs) == 1
+    assert [call["match_limit"] for call in supabase.calls] == [10, 5]